@@ -12,14 +12,18 @@
 
 import streamlit as st
 import sqlite3
-import pandas as pd
 import hashlib
+import hmac
 import datetime
-import uuid
+import random
 import os
-import csv
-import json
 import time
+import atexit
+import threading
+import collections
+import functools
+import queue
+import weakref
 
 # =====================================================================================
 # APPLICATION CONFIGURATION
@@ -43,29 +47,189 @@ if not os.path.exists(EXPORT_DIR):
 # DATABASE CONNECTION
 # =====================================================================================
 
-def get_db_connection():
-    return sqlite3.connect(DATABASE_NAME, check_same_thread=False)
+# WAL journaling lets dashboard reads run alongside sales/expense/audit writes.
+# NOTE: WAL keeps "<db>-wal" and "<db>-shm" sidecar files next to the database;
+# they belong to it and must be copied/backed up together with it.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",      # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MiB memory-mapped I/O
+)
+
+def apply_pragmas(connection):
+    for pragma in SQLITE_PRAGMAS:
+        connection.execute(pragma)
 
-conn = get_db_connection()
-cursor = conn.cursor()
+def get_db_connection():
+    connection = sqlite3.connect(DATABASE_NAME, check_same_thread=False, cached_statements=256)
+    # Rows support both index and column-name access without building DataFrames.
+    connection.row_factory = sqlite3.Row
+    apply_pragmas(connection)
+    return connection
+
+# Streamlit re-executes this script in a fresh namespace on every rerun and
+# usually on a fresh thread too, so connections are pooled in a cache_resource.
+# A thread leases one connection on first use; when the thread ends its lease
+# is collected and the connection goes back to the idle pool for the next run.
+@st.cache_resource
+def _connection_pool():
+    return queue.SimpleQueue(), threading.local()
+
+class _ConnectionLease:
+    def __init__(self, connection):
+        self.connection = connection
+
+def _release_connection(idle, connection):
+    if connection.in_transaction:
+        connection.rollback()
+    idle.put(connection)
+
+def get_conn():
+    idle, leases = _connection_pool()
+    lease = getattr(leases, "lease", None)
+    if lease is None:
+        try:
+            connection = idle.get_nowait()
+        except queue.Empty:
+            connection = get_db_connection()
+        lease = _ConnectionLease(connection)
+        weakref.finalize(lease, _release_connection, idle, connection)
+        leases.lease = lease
+    return lease.connection
+
+# =====================================================================================
+# SQL STATEMENTS
+# =====================================================================================
+# Write statements name their columns instead of relying on schema order, and
+# are built once so every call hits the same sqlite3 statement cache entry.
+
+USER_COLUMNS = ("username", "password", "role", "created_at", "salt")
+PRODUCT_COLUMNS = (
+    "sku", "name", "category", "supplier", "cost_price", "selling_price",
+    "stock", "reorder_level", "expiry_date", "created_at"
+)
+SALE_COLUMNS = ("invoice_no", "sku", "quantity", "price", "total", "sold_by", "sold_at")
+EXPENSE_COLUMNS = ("title", "amount", "created_at")
+AUDIT_LOG_COLUMNS = ("action", "user", "timestamp")
+
+@functools.lru_cache(maxsize=None)
+def insert_sql(table, columns):
+    placeholders = ",".join("?" * len(columns))
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+def bulk_insert(table, columns, rows):
+    # One prepared statement and one transaction for any number of rows.
+    # Table and column names are always constants from this file.
+    conn = get_conn()
+    with conn:
+        conn.executemany(insert_sql(table, columns), rows)
+
+# Fixed statements run directly (inside a caller's own transaction) are
+# module constants; insert_sql() is only called here and by bulk_insert().
+INSERT_USER_SQL = insert_sql("users", USER_COLUMNS)
+INSERT_SALE_SQL = insert_sql("sales", SALE_COLUMNS)
+UPDATE_USER_PASSWORD_SQL = "UPDATE users SET password=?, salt=? WHERE username=?"
+LOGIN_SQL = "SELECT role, password, salt FROM users WHERE username=?"
+# Decrements stock only when enough is on hand; returns no row otherwise.
+RESERVE_STOCK_SQL = (
+    "UPDATE products SET stock = stock - ? WHERE sku = ? AND stock >= ? "
+    "RETURNING selling_price, stock"
+)
 
 # =====================================================================================
 # DATABASE INITIALIZATION
 # =====================================================================================
 
+ROLLUP_TABLES = ("sales_daily", "expenses_daily")
+
+def _rollups_exist(conn):
+    placeholders = ",".join("?" * len(ROLLUP_TABLES))
+    found = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name IN ({placeholders})",
+        ROLLUP_TABLES
+    ).fetchone()[0]
+    return found == len(ROLLUP_TABLES)
+
+def initialize_rollups(conn):
+    # Daily rollups kept current by triggers, so reports never scan the fact tables.
+    # Tables, triggers and backfill are created once, together, under the write
+    # lock: no sale can slip in between and no other session can backfill twice.
+    if _rollups_exist(conn):
+        return
+
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if _rollups_exist(conn):
+            return
+
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sales_daily (
+                day TEXT PRIMARY KEY,
+                revenue REAL,
+                qty INTEGER
+            )
+        """)
+
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS expenses_daily (
+                day TEXT PRIMARY KEY,
+                amount REAL
+            )
+        """)
+
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_sales_ai AFTER INSERT ON sales
+            BEGIN
+                INSERT INTO sales_daily (day, revenue, qty)
+                VALUES (date(NEW.sold_at), NEW.total, NEW.quantity)
+                ON CONFLICT(day) DO UPDATE SET
+                    revenue = revenue + excluded.revenue,
+                    qty = qty + excluded.qty;
+            END
+        """)
+
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_expenses_ai AFTER INSERT ON expenses
+            BEGIN
+                INSERT INTO expenses_daily (day, amount)
+                VALUES (date(NEW.created_at), NEW.amount)
+                ON CONFLICT(day) DO UPDATE SET
+                    amount = amount + excluded.amount;
+            END
+        """)
+
+        # Backfill from the history that existed before the triggers did.
+        conn.execute("""
+            INSERT INTO sales_daily (day, revenue, qty)
+            SELECT date(sold_at), SUM(total), SUM(quantity) FROM sales GROUP BY date(sold_at)
+        """)
+        conn.execute("""
+            INSERT INTO expenses_daily (day, amount)
+            SELECT date(created_at), SUM(amount) FROM expenses GROUP BY date(created_at)
+        """)
+
 def initialize_database():
+    conn = get_conn()
 
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT UNIQUE,
             password TEXT,
             role TEXT,
-            created_at TEXT
+            created_at TEXT,
+            salt TEXT
         )
     """)
 
-    cursor.execute("""
+    # Databases created before per-user salts need the column added in place.
+    user_columns = [row["name"] for row in conn.execute("PRAGMA table_info(users)")]
+    if "salt" not in user_columns:
+        conn.execute("ALTER TABLE users ADD COLUMN salt TEXT")
+
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS products (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             sku TEXT UNIQUE,
@@ -81,7 +245,7 @@ def initialize_database():
         )
     """)
 
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS suppliers (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT,
@@ -91,7 +255,7 @@ def initialize_database():
         )
     """)
 
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS customers (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT,
@@ -101,7 +265,7 @@ def initialize_database():
         )
     """)
 
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS sales (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             invoice_no TEXT,
@@ -114,7 +278,7 @@ def initialize_database():
         )
     """)
 
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS expenses (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             title TEXT,
@@ -123,7 +287,7 @@ def initialize_database():
         )
     """)
 
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS audit_logs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             action TEXT,
@@ -132,6 +296,13 @@ def initialize_database():
         )
     """)
 
+    initialize_rollups(conn)
+
+    # users.username and products.sku are already indexed through their UNIQUE constraints.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_sku ON sales(sku)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_sold_at ON sales(sold_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_ts ON audit_logs(timestamp DESC)")
+
     conn.commit()
 
 initialize_database()
@@ -140,8 +311,40 @@ initialize_database()
 # SECURITY UTILITIES
 # =====================================================================================
 
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+PASSWORD_ITERATIONS = 200_000
+
+def generate_salt():
+    return os.urandom(16).hex()
+
+def hash_password(password, salt):
+    return hashlib.pbkdf2_hmac(
+        "sha256", password.encode(), bytes.fromhex(salt), PASSWORD_ITERATIONS
+    ).hex()
+
+# Used to spend the same KDF time on logins that have no stored salt, so the
+# response time does not reveal whether a username exists.
+_DUMMY_SALT = generate_salt()
+
+def verify_password(password, salt, stored_hash):
+    if salt is None:
+        # Legacy row: unsalted SHA-256, upgraded to PBKDF2 on next successful login.
+        hash_password(password, _DUMMY_SALT)
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+    else:
+        candidate = hash_password(password, salt)
+    return hmac.compare_digest(candidate, stored_hash or "")
+
+# =====================================================================================
+# ID & TIMESTAMP UTILITIES
+# =====================================================================================
+
+def now_iso():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+def new_id(prefix):
+    # Millisecond timestamp first so new SKUs/invoices sort after existing ones and
+    # land on the rightmost index page; the random suffix separates same-ms IDs.
+    return f"{prefix}{int(time.time() * 1000):x}{random.randint(0, 0xffff):04x}"
 
 # =====================================================================================
 # SESSION STATE SETUP
@@ -157,13 +360,22 @@ if "authenticated" not in st.session_state:
 # =====================================================================================
 
 def create_default_admin():
-    cursor.execute("SELECT COUNT(*) FROM users")
-    if cursor.fetchone()[0] == 0:
-        cursor.execute(
-            "INSERT INTO users (username, password, role, created_at) VALUES (?,?,?,?)",
-            ("Ismail Khan", hash_password("khan123"), "Admin", str(datetime.datetime.now()))
-        )
-        conn.commit()
+    conn = get_conn()
+    # Runs on every rerun: the unlocked check keeps ordinary page views from
+    # taking the write lock once any user exists.
+    if conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is not None:
+        return
+
+    # BEGIN IMMEDIATE takes the write lock before the re-check, so two sessions
+    # starting together cannot both see an empty table and seed the admin twice.
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None:
+            salt = generate_salt()
+            conn.execute(
+                INSERT_USER_SQL,
+                ("Ismail Khan", hash_password("khan123", salt), "Admin", now_iso(), salt)
+            )
 
 create_default_admin()
 
@@ -171,6 +383,52 @@ create_default_admin()
 # AUTHENTICATION SYSTEM
 # =====================================================================================
 
+# After MAX_LOGIN_FAILURES failed attempts within LOGIN_FAILURE_WINDOW seconds a
+# username is refused without touching SQLite or running the password KDF.
+MAX_LOGIN_FAILURES = 5
+LOGIN_FAILURE_WINDOW = 60
+# Upper bound on tracked usernames so spraying random names cannot grow memory.
+MAX_TRACKED_LOGINS = 10_000
+
+@st.cache_resource
+def _login_failures():
+    # Ordered by most recent failure, oldest first, so expired entries and
+    # overflow are always evicted from the front.
+    return collections.OrderedDict(), threading.Lock()
+
+def login_throttled(username):
+    failures, lock = _login_failures()
+    cutoff = time.monotonic() - LOGIN_FAILURE_WINDOW
+    with lock:
+        attempts = failures.get(username)
+        if attempts is None:
+            return False
+        while attempts and attempts[0] < cutoff:
+            attempts.popleft()
+        if not attempts:
+            del failures[username]
+            return False
+        return len(attempts) >= MAX_LOGIN_FAILURES
+
+def record_login_failure(username):
+    failures, lock = _login_failures()
+    now = time.monotonic()
+    cutoff = now - LOGIN_FAILURE_WINDOW
+    with lock:
+        attempts = failures.pop(username, None) or collections.deque(maxlen=MAX_LOGIN_FAILURES)
+        attempts.append(now)
+        failures[username] = attempts
+        while failures:
+            oldest = next(iter(failures.values()))
+            if oldest[-1] >= cutoff and len(failures) <= MAX_TRACKED_LOGINS:
+                break
+            failures.popitem(last=False)
+
+def reset_login_failures(username):
+    failures, lock = _login_failures()
+    with lock:
+        failures.pop(username, None)
+
 def login_page():
     st.title("🔐 System Login")
 
@@ -178,25 +436,43 @@ def login_page():
     password = st.text_input("Password", type="password")
 
     if st.button("Login"):
-        hashed = hash_password(password)
-        cursor.execute(
-            "SELECT role FROM users WHERE username=? AND password=?",
-            (username, hashed)
-        )
-        result = cursor.fetchone()
+        if login_throttled(username):
+            st.error("Too many failed attempts. Please wait a minute and try again.")
+            return
+
+        conn = get_conn()
+        result = conn.execute(LOGIN_SQL, (username,)).fetchone()
+
+        if result is None:
+            # Unknown usernames still pay for a full PBKDF2 run before failing.
+            hash_password(password, _DUMMY_SALT)
+            authenticated = False
+        else:
+            authenticated = verify_password(password, result["salt"], result["password"])
+
+        if authenticated:
+            reset_login_failures(username)
+            if result["salt"] is None:
+                salt = generate_salt()
+                conn.execute(
+                    UPDATE_USER_PASSWORD_SQL,
+                    (hash_password(password, salt), salt, username)
+                )
+                conn.commit()
 
-        if result:
             st.session_state.authenticated = True
             st.session_state.username = username
-            st.session_state.role = result[0]
+            st.session_state.role = result["role"]
             log_action("User Logged In")
             st.experimental_rerun()
         else:
+            record_login_failure(username)
             st.error("Invalid username or password")
 
 
 def logout():
     log_action("User Logged Out")
+    _flush_logs()
     st.session_state.authenticated = False
     st.session_state.username = None
     st.session_state.role = None
@@ -206,12 +482,34 @@ def logout():
 # AUDIT LOGGING
 # =====================================================================================
 
+# Audit rows are buffered and written in batches so each action does not pay
+# for its own commit. The buffer is flushed on logout, at interpreter exit and
+# before the audit log page is rendered.
+LOG_FLUSH_THRESHOLD = 50
+
+# Streamlit re-executes this script on every rerun, so the buffer lives in a
+# cache_resource shared by all reruns and sessions instead of a module global.
+@st.cache_resource
+def _audit_log_buffer():
+    atexit.register(_flush_logs)
+    return collections.deque(), threading.Lock()
+
+def _flush_logs():
+    log_buf, log_lock = _audit_log_buffer()
+    with log_lock:
+        rows = list(log_buf)
+        log_buf.clear()
+    if rows:
+        bulk_insert("audit_logs", AUDIT_LOG_COLUMNS, rows)
+    return len(rows)
+
 def log_action(action):
-    cursor.execute(
-        "INSERT INTO audit_logs (action, user, timestamp) VALUES (?,?,?)",
-        (action, st.session_state.username, str(datetime.datetime.now()))
-    )
-    conn.commit()
+    log_buf, log_lock = _audit_log_buffer()
+    with log_lock:
+        log_buf.append((action, st.session_state.username, now_iso()))
+        pending = len(log_buf)
+    if pending >= LOG_FLUSH_THRESHOLD:
+        _flush_logs()
 
 # =====================================================================================
 # SIDEBAR NAVIGATION
@@ -238,21 +536,47 @@ def sidebar():
     return st.sidebar.radio("Navigation", menu)
 
 # =====================================================================================
-# DASHBOARD MODULE
+# PAGINATED TABLE VIEWS
 # =====================================================================================
+# Table views read one page at a time instead of the whole table. Queries are
+# fixed strings from this file and must carry their own ORDER BY.
 
-def dashboard():
-    st.title("📊 Business Dashboard")
+PAGE_SIZE = 100
 
-    cursor.execute("SELECT COUNT(*) FROM products")
-    total_products = cursor.fetchone()[0]
+@st.cache_data(ttl=15, show_spinner=False)
+def _load_page(query, page):
+    # pandas is imported lazily so the login page and dashboard never load it.
+    import pandas as pd
+    return pd.read_sql(
+        f"{query} LIMIT ? OFFSET ?", get_conn(), params=(PAGE_SIZE, (page - 1) * PAGE_SIZE)
+    )
 
-    cursor.execute("SELECT SUM(total) FROM sales")
-    total_sales = cursor.fetchone()[0] or 0
 
-    cursor.execute("SELECT SUM(amount) FROM expenses")
-    total_expenses = cursor.fetchone()[0] or 0
+# Runs as a fragment so paging reruns only this table, not the whole module.
+@st.fragment
+def paginated_dataframe(query, key):
+    page = st.number_input("Page", min_value=1, step=1, key=key)
+    st.dataframe(_load_page(query, page), use_container_width=True)
+
+# =====================================================================================
+# DASHBOARD MODULE
+# =====================================================================================
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _dashboard_metrics():
+    # st.cache_data pickles its result and sqlite3.Row is not picklable.
+    return tuple(get_conn().execute("""
+        SELECT
+            (SELECT COUNT(*) FROM products),
+            (SELECT COALESCE(SUM(total), 0) FROM sales),
+            (SELECT COALESCE(SUM(amount), 0) FROM expenses)
+    """).fetchone())
+
+
+def dashboard():
+    st.title("📊 Business Dashboard")
 
+    total_products, total_sales, total_expenses = _dashboard_metrics()
     profit = total_sales - total_expenses
 
     col1, col2, col3, col4 = st.columns(4)
@@ -280,49 +604,58 @@ def product_management():
         submit = st.form_submit_button("Add Product")
 
         if submit:
-            sku = str(uuid.uuid4())[:8]
-            cursor.execute(
-                "INSERT INTO products VALUES (NULL,?,?,?,?,?,?,?,?,?,?)",
+            sku = new_id("P")
+            bulk_insert("products", PRODUCT_COLUMNS, [
                 (sku, name, category, supplier, cost_price, selling_price,
-                 stock, reorder_level, str(expiry), str(datetime.datetime.now()))
-            )
-            conn.commit()
+                 stock, reorder_level, str(expiry), now_iso())
+            ])
+            st.cache_data.clear()
             log_action(f"Product Added: {name}")
             st.success("Product added successfully")
 
-    df = pd.read_sql("SELECT * FROM products", conn)
-    st.dataframe(df, use_container_width=True)
+    paginated_dataframe("SELECT * FROM products ORDER BY id", key="products_page")
 
 # =====================================================================================
 # SALES MODULE
 # =====================================================================================
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_products_df():
+    import pandas as pd
+    products = pd.read_sql("SELECT sku, name, selling_price, stock FROM products", get_conn())
+    name_to_sku = dict(zip(products["name"], products["sku"]))
+    return products, name_to_sku
+
+
 def sales_module():
     st.title("🧾 Sales & Billing")
 
-    products = pd.read_sql("SELECT sku, name, selling_price, stock FROM products", conn)
+    products, name_to_sku = _load_products_df()
     product_name = st.selectbox("Select Product", products["name"])
     quantity = st.number_input("Quantity", min_value=1)
 
     if st.button("Process Sale"):
-        product = products[products["name"] == product_name].iloc[0]
-
-        if product["stock"] >= quantity:
-            total = product["selling_price"] * quantity
-            invoice = str(uuid.uuid4())[:6]
-
-            cursor.execute(
-                "INSERT INTO sales VALUES (NULL,?,?,?,?,?,?,?)",
-                (invoice, product["sku"], quantity, product["selling_price"],
-                 total, st.session_state.username, str(datetime.datetime.now()))
-            )
-
-            cursor.execute(
-                "UPDATE products SET stock = stock - ? WHERE sku = ?",
-                (quantity, product["sku"])
-            )
-
-            conn.commit()
+        sku = name_to_sku[product_name]
+        conn = get_conn()
+
+        # The stock guard runs against the table, not the cached frame, so
+        # concurrent sales cannot oversell; both writes commit together.
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            reserved = conn.execute(RESERVE_STOCK_SQL, (quantity, sku, quantity)).fetchone()
+            if reserved is not None:
+                price = reserved["selling_price"]
+                total = price * quantity
+                invoice = new_id("INV")
+
+                conn.execute(
+                    INSERT_SALE_SQL,
+                    (invoice, sku, quantity, price,
+                     total, st.session_state.username, now_iso())
+                )
+
+        if reserved is not None:
+            st.cache_data.clear()
             log_action(f"Sale Invoice {invoice}")
             st.success(f"Sale completed | Invoice: {invoice} | Total: {total}")
         else:
@@ -339,16 +672,14 @@ def expense_module():
     amount = st.number_input("Amount", min_value=0.0)
 
     if st.button("Add Expense"):
-        cursor.execute(
-            "INSERT INTO expenses VALUES (NULL,?,?,?)",
-            (title, amount, str(datetime.datetime.now()))
-        )
-        conn.commit()
+        bulk_insert("expenses", EXPENSE_COLUMNS, [
+            (title, amount, now_iso())
+        ])
+        st.cache_data.clear()
         log_action("Expense Added")
         st.success("Expense recorded")
 
-    df = pd.read_sql("SELECT * FROM expenses", conn)
-    st.dataframe(df, use_container_width=True)
+    paginated_dataframe("SELECT * FROM expenses ORDER BY id", key="expenses_page")
 
 # =====================================================================================
 # REPORTING MODULE
@@ -357,14 +688,17 @@ def expense_module():
 def reports_module():
     st.title("📈 Business Reports")
 
-    sales_df = pd.read_sql("SELECT * FROM sales", conn)
-    expenses_df = pd.read_sql("SELECT * FROM expenses", conn)
-
-    st.subheader("Sales Report")
-    st.dataframe(sales_df, use_container_width=True)
+    st.subheader("Daily Sales Report")
+    paginated_dataframe(
+        "SELECT day, revenue, qty AS quantity FROM sales_daily ORDER BY day DESC",
+        key="sales_report_page"
+    )
 
-    st.subheader("Expense Report")
-    st.dataframe(expenses_df, use_container_width=True)
+    st.subheader("Daily Expense Report")
+    paginated_dataframe(
+        "SELECT day, amount FROM expenses_daily ORDER BY day DESC",
+        key="expense_report_page"
+    )
 
 # =====================================================================================
 # USER MANAGEMENT MODULE
@@ -382,16 +716,22 @@ def user_management():
     role = st.selectbox("Role", ["Admin", "Manager", "Cashier"])
 
     if st.button("Create User"):
-        cursor.execute(
-            "INSERT INTO users VALUES (NULL,?,?,?,?)",
-            (username, hash_password(password), role, str(datetime.datetime.now()))
-        )
-        conn.commit()
+        salt = generate_salt()
+        bulk_insert("users", USER_COLUMNS, [
+            (username, hash_password(password, salt), role, now_iso(), salt)
+        ])
+        st.cache_data.clear()
         log_action("User Created")
         st.success("User created successfully")
 
-    df = pd.read_sql("SELECT id, username, role, created_at FROM users", conn)
-    st.dataframe(df, use_container_width=True)
+    # The user list is normally tiny: render plain rows and only fall back to
+    # the paginated DataFrame view once it outgrows a single page.
+    users_query = "SELECT id, username, role, created_at FROM users ORDER BY id"
+    users = get_conn().execute(f"{users_query} LIMIT ?", (PAGE_SIZE + 1,)).fetchall()
+    if len(users) <= PAGE_SIZE:
+        st.table([dict(user) for user in users])
+    else:
+        paginated_dataframe(users_query, key="users_page")
 
 # =====================================================================================
 # AUDIT LOGS MODULE
@@ -399,8 +739,10 @@ def user_management():
 
 def audit_logs():
     st.title("🛡 Audit Logs")
-    df = pd.read_sql("SELECT * FROM audit_logs ORDER BY timestamp DESC", conn)
-    st.dataframe(df, use_container_width=True)
+    if _flush_logs():
+        _load_page.clear()
+    # Timestamps have one-second resolution; id breaks ties in action order.
+    paginated_dataframe("SELECT * FROM audit_logs ORDER BY timestamp DESC, id DESC", key="audit_page")
 
 # =====================================================================================
 # DATA EXPORT MODULE
@@ -419,15 +761,39 @@ def export_data():
     choice = st.selectbox("Select Table", list(tables.keys()))
 
     if st.button("Export CSV"):
-        df = pd.read_sql(f"SELECT * FROM {tables[choice]}", conn)
+        import csv
+        # Table names come from the fixed dict above, never from user input.
+        export_cursor = get_conn().execute(f"SELECT * FROM {tables[choice]}")
+        export_cursor.arraysize = 1000
         filename = f"{EXPORT_DIR}/{choice}_{int(time.time())}.csv"
-        df.to_csv(filename, index=False)
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow([column[0] for column in export_cursor.description])
+            while True:
+                rows = export_cursor.fetchmany()
+                if not rows:
+                    break
+                writer.writerows(rows)
         st.success(f"Exported: {filename}")
 
 # =====================================================================================
 # MAIN APPLICATION ROUTER
 # =====================================================================================
 
+PAGES = {
+    "Dashboard": dashboard,
+    "Products": product_management,
+    "Sales": sales_module,
+    "Expenses": expense_module,
+    "Reports": reports_module,
+    "User Management": user_management,
+    "Audit Logs": audit_logs,
+    "Data Export": export_data
+}
+
+def module_under_development():
+    st.info("Module under development")
+
 if not st.session_state.authenticated:
     login_page()
 else:
@@ -436,24 +802,7 @@ else:
     if st.sidebar.button("Logout"):
         logout()
 
-    if page == "Dashboard":
-        dashboard()
-    elif page == "Products":
-        product_management()
-    elif page == "Sales":
-        sales_module()
-    elif page == "Expenses":
-        expense_module()
-    elif page == "Reports":
-        reports_module()
-    elif page == "User Management":
-        user_management()
-    elif page == "Audit Logs":
-        audit_logs()
-    elif page == "Data Export":
-        export_data()
-    else:
-        st.info("Module under development")
+    PAGES.get(page, module_under_development)()
 
 # =====================================================================================
 # END OF APPLICATION